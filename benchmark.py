@@ -0,0 +1,370 @@
+"""
+Performance benchmarks for the Weather API module
+Runs against a local stub server, so no API key or internet connection is needed
+"""
+
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import weather_api
+from weather_api import (WeatherAPI, OpenWeatherMapProvider, RecordingTransport, ReplayTransport,
+                         JSON_DECODERS, WeatherDeltaFeed, compute_derived_metrics, derived_metrics)
+
+
+# Representative OpenWeatherMap current weather response
+SAMPLE_RESPONSE = {
+    "coord": {"lon": -0.1257, "lat": 51.5085},
+    "weather": [{"id": 803, "main": "Clouds", "description": "broken clouds", "icon": "04d"}],
+    "base": "stations",
+    "main": {"temp": 14.62, "feels_like": 14.13, "temp_min": 13.38, "temp_max": 15.71,
+             "pressure": 1012, "humidity": 79, "sea_level": 1012, "grnd_level": 1008},
+    "visibility": 10000,
+    "wind": {"speed": 4.63, "deg": 240, "gust": 8.2},
+    "clouds": {"all": 75},
+    "dt": 1760860800,
+    "sys": {"type": 2, "id": 2075535, "country": "GB", "sunrise": 1760854967, "sunset": 1760892802},
+    "timezone": 3600,
+    "id": 2643743,
+    "name": "London",
+    "cod": 200
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves SAMPLE_RESPONSE, delaying a fraction of responses"""
+
+    slow_rate = 0.0
+    slow_delay = 0.0
+    base_delay = 0.0
+
+    def do_GET(self):
+        delay = self.base_delay
+        if random.random() < self.slow_rate:
+            delay += self.slow_delay
+        if delay:
+            time.sleep(delay)
+
+        body = json.dumps(SAMPLE_RESPONSE).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(slow_rate: float = 0.0, slow_delay: float = 0.0, base_delay: float = 0.0):
+    """Start a stub server in a background thread and return (server, base_url)"""
+    handler = type("ConfiguredStubHandler", (StubHandler,),
+                   {"slow_rate": slow_rate, "slow_delay": slow_delay, "base_delay": base_delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/data/2.5/weather"
+
+
+def percentile(samples, pct):
+    """Return the given percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+def report(label, latencies):
+    """Print latency percentiles in milliseconds"""
+    p50, p95, p99 = (percentile(latencies, p) * 1000 for p in (50, 95, 99))
+    print(f"{label:<20} p50={p50:7.1f}ms  p95={p95:7.1f}ms  p99={p99:7.1f}ms  max={max(latencies) * 1000:7.1f}ms")
+
+
+def benchmark_hedging(requests_count: int = 400, slow_rate: float = 0.03, slow_delay: float = 0.5,
+                      warmup: int = 50):
+    """Compare tail latency with and without hedged requests"""
+    print(f"=== Hedged requests ({requests_count} lookups, {slow_rate:.0%} delayed by {slow_delay}s) ===")
+
+    server, base_url = start_stub_server(slow_rate=slow_rate, slow_delay=slow_delay, base_delay=0.002)
+    try:
+        for hedge in (False, True):
+            random.seed(42)
+            weather_api = WeatherAPI(api_key="benchmark", base_url=base_url, hedge=hedge)
+            latencies = []
+            for i in range(warmup + requests_count):
+                start = time.perf_counter()
+                success, data = weather_api.get_weather_data("London")
+                if not success:
+                    print(f"❌ {data['error']}")
+                    return
+                # The first lookups only train the adaptive hedge delay
+                if i >= warmup:
+                    latencies.append(time.perf_counter() - start)
+            report("hedged" if hedge else "single request", latencies)
+            weather_api.close()
+    finally:
+        server.shutdown()
+
+
+def benchmark_routing(requests_count: int = 200):
+    """Route lookups across a fast and a slow stub provider, then fail over when the fast one stops"""
+    print(f"=== Provider routing ({requests_count} lookups per phase) ===")
+
+    fast_server, fast_url = start_stub_server(base_delay=0.002)
+    slow_server, slow_url = start_stub_server(base_delay=0.02)
+    providers = [
+        OpenWeatherMapProvider(api_key="benchmark", base_url=slow_url, name="slow"),
+        OpenWeatherMapProvider(api_key="benchmark", base_url=fast_url, name="fast"),
+    ]
+    weather_api = WeatherAPI(providers=providers)
+
+    def run_phase(label):
+        latencies = []
+        failures = 0
+        for _ in range(requests_count):
+            start = time.perf_counter()
+            success, _ = weather_api.get_weather_data("London")
+            latencies.append(time.perf_counter() - start)
+            failures += not success
+        report(label, latencies)
+        for stats in weather_api.router.stats():
+            median = stats["median_latency"]
+            median_text = f"{median * 1000:.1f}ms" if median is not None else "n/a"
+            print(f"    {stats['name']:<6} lookups={stats['lookups']:<4} error_rate={stats['error_rate']:.2f}  "
+                  f"median={median_text}  circuit={stats['circuit']}")
+        print(f"    failed lookups: {failures}")
+
+    try:
+        run_phase("both providers up")
+        fast_server.shutdown()
+        fast_server.server_close()
+        run_phase("fast provider down")
+    finally:
+        slow_server.shutdown()
+
+
+def make_observations(count: int, seed: int = 7):
+    """Generate parsed weather results with realistic value ranges"""
+    rng = random.Random(seed)
+    observations = []
+    for _ in range(count):
+        sunrise = 1760854967 + rng.randint(-7200, 7200)
+        observations.append({
+            "temperature": round(rng.uniform(-25, 42), 1),
+            "humidity": rng.randint(5, 100),
+            "wind_speed": round(rng.uniform(0, 30), 2),
+            "wind_direction": rng.randint(0, 359),
+            "sunrise": sunrise,
+            "sunset": sunrise + rng.randint(8, 16) * 3600,
+        })
+    return observations
+
+
+def benchmark_derived(count: int = 200000):
+    """Compare per-record derived metrics with the batched column computation"""
+    backend = "numpy" if weather_api.np is not None else "python fallback"
+    print(f"=== Derived metrics ({count} observations, batch backend: {backend}) ===")
+
+    observations = make_observations(count)
+
+    start = time.perf_counter()
+    for record in observations:
+        derived_metrics(record)
+    per_record = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compute_derived_metrics(observations)
+    batched = time.perf_counter() - start
+
+    print(f"{'per record':<20} {per_record:7.3f}s  ({count / per_record:,.0f} obs/s)")
+    print(f"{'batched':<20} {batched:7.3f}s  ({count / batched:,.0f} obs/s)")
+
+
+# Sample of OpenWeatherMap condition codes with their English descriptions
+CONDITIONS = [
+    (200, "thunderstorm with light rain"), (211, "thunderstorm"), (300, "light intensity drizzle"),
+    (500, "light rain"), (501, "moderate rain"), (521, "shower rain"), (600, "light snow"),
+    (611, "sleet"), (701, "mist"), (721, "haze"), (741, "fog"), (800, "clear sky"),
+    (801, "few clouds"), (802, "scattered clouds"), (803, "broken clouds"), (804, "overcast clouds"),
+]
+
+
+def legacy_get_weather_icon(description: str) -> str:
+    """The description-scanning icon lookup that condition codes replaced"""
+    from config import WEATHER_ICONS
+
+    description_lower = description.lower()
+    for condition, icon in WEATHER_ICONS.items():
+        if condition in description_lower:
+            return icon
+
+    if any(word in description_lower for word in ["sun", "clear"]):
+        return "☀️"
+    elif any(word in description_lower for word in ["cloud", "overcast"]):
+        return "☁️"
+    elif any(word in description_lower for word in ["rain", "drizzle"]):
+        return "🌧️"
+    elif "snow" in description_lower:
+        return "❄️"
+    elif any(word in description_lower for word in ["storm", "thunder"]):
+        return "⛈️"
+    else:
+        return "🌤️"
+
+
+def benchmark_icons(count: int = 500000):
+    """Compare the description scan, condition code lookups and the batch icon API"""
+    print(f"=== Weather icons ({count} lookups) ===")
+
+    rng = random.Random(3)
+    sample = [rng.choice(CONDITIONS) for _ in range(count)]
+    codes = [code for code, _ in sample]
+    descriptions = [description.title() for _, description in sample]
+
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<20} {elapsed:7.3f}s  ({count / elapsed:,.0f} lookups/s)")
+
+    timed("description scan", lambda: [legacy_get_weather_icon(d) for d in descriptions])
+    timed("cached description", lambda: [WeatherAPI.get_weather_icon(d) for d in descriptions])
+    timed("condition code", lambda: [WeatherAPI.get_weather_icon(d, c) for d, c in zip(descriptions, codes)])
+    timed("batch", lambda: WeatherAPI.get_weather_icons(codes, descriptions))
+
+
+def benchmark_replay(cities: int = 200, lookups: int = 300000):
+    """Record a cassette from the stub server, then replay lookups through the parse and cache paths"""
+    print(f"=== Cassette replay ({cities} recorded cities, {lookups} lookups) ===")
+
+    server, base_url = start_stub_server()
+    handle, path = tempfile.mkstemp(suffix=".ndjson")
+    os.close(handle)
+    try:
+        recorder = WeatherAPI(api_key="benchmark", base_url=base_url, transport=RecordingTransport(path))
+        names = [f"City {i}" for i in range(cities)]
+        for name in names:
+            recorder.get_weather_data(name)
+        server.shutdown()
+
+        start = time.perf_counter()
+        transport = ReplayTransport(path)
+        print(f"{'index':<20} {time.perf_counter() - start:7.3f}s  ({len(transport)} responses)")
+
+        weather_api = WeatherAPI(api_key="benchmark", base_url=base_url, transport=transport, cache={})
+        failures = 0
+        start = time.perf_counter()
+        for i in range(lookups):
+            success, _ = weather_api.get_weather_data(names[i % cities])
+            failures += not success
+        elapsed = time.perf_counter() - start
+        print(f"{'replay':<20} {elapsed:7.3f}s  ({lookups / elapsed * 60:,.0f} lookups/min, {failures} failed)")
+    finally:
+        os.remove(path)
+
+
+def make_payloads(count: int, seed: int = 11):
+    """Generate encoded API responses with the variations real responses have"""
+    rng = random.Random(seed)
+    names = ["London", "São Paulo", "Zürich", "Kraków", "東京", "Reykjavík", "New York", "Cairo"]
+    payloads = []
+    for _ in range(count):
+        response = json.loads(json.dumps(SAMPLE_RESPONSE))
+        response["name"] = rng.choice(names)
+        response["main"]["temp"] = round(rng.uniform(-20, 40), 2)
+        response["main"]["humidity"] = rng.randint(10, 100)
+        response["wind"]["deg"] = rng.randint(0, 359)
+        if rng.random() < 0.3:
+            response["rain"] = {"1h": round(rng.uniform(0.1, 8), 2)}
+            response["weather"].append({"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"})
+        if rng.random() < 0.1:
+            response["snow"] = {"1h": round(rng.uniform(0.1, 3), 2)}
+        payloads.append(json.dumps(response, ensure_ascii=rng.random() < 0.5).encode("utf-8"))
+    return payloads
+
+
+def benchmark_decode(count: int = 20000, rounds: int = 5):
+    """Decode and parse realistic response bodies with each installed JSON backend"""
+    print(f"=== Response decoding ({count} payloads x {rounds} rounds, single core) ===")
+
+    payloads = make_payloads(count)
+    provider = OpenWeatherMapProvider()
+    total = count * rounds
+
+    for name, loads in JSON_DECODERS.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for body in payloads:
+                provider.parse(loads(body))
+        elapsed = time.perf_counter() - start
+        print(f"{name + ' + parse':<20} {elapsed:7.3f}s  ({total / elapsed:,.0f} responses/s)")
+
+    decoded = [json.loads(body) for body in payloads]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for data in decoded:
+            provider.parse(data)
+    elapsed = time.perf_counter() - start
+    print(f"{'parse only':<20} {elapsed:7.3f}s  ({total / elapsed:,.0f} responses/s)")
+
+
+def benchmark_delta(cities: int = 300, polls: int = 50):
+    """Compare streaming full results with the change-detection feed over repeated polls"""
+    print(f"=== Change detection ({cities} cities x {polls} polls) ===")
+
+    rng = random.Random(5)
+    provider = OpenWeatherMapProvider()
+    observations = {f"City {i:03d}": provider.parse(json.loads(body))
+                    for i, body in enumerate(make_payloads(cities))}
+
+    stream = io.StringIO()
+    feed = WeatherDeltaFeed(stream=stream)
+    full_bytes = 0
+    events = 0
+    elapsed = 0.0
+    for _ in range(polls):
+        for city, data in observations.items():
+            # Most refreshes only jitter a little; some really change
+            data["temperature"] = round(data["temperature"] + rng.gauss(0, 0.1), 1)
+            data["pressure"] = data["pressure"] + rng.choice((0, 0, 0, 1, -1))
+            if rng.random() < 0.05:
+                data["humidity"] = max(0, min(100, data["humidity"] + rng.randint(-5, 5)))
+            full_bytes += len(json.dumps(data, ensure_ascii=False)) + 1
+
+            start = time.perf_counter()
+            events += feed.update(city, data) is not None
+            elapsed += time.perf_counter() - start
+
+    updates = cities * polls
+    delta_bytes = len(stream.getvalue())
+    print(f"{'full results':<20} {updates} records, {full_bytes / 1024:8.1f} KiB")
+    print(f"{'delta feed':<20} {events} events,  {delta_bytes / 1024:8.1f} KiB "
+          f"({delta_bytes / full_bytes:.0%} of full, {updates / elapsed:,.0f} updates/s)")
+
+
+BENCHMARKS = {
+    "hedging": benchmark_hedging,
+    "routing": benchmark_routing,
+    "derived": benchmark_derived,
+    "icons": benchmark_icons,
+    "replay": benchmark_replay,
+    "decode": benchmark_decode,
+    "delta": benchmark_delta,
+}
+
+
+if __name__ == "__main__":
+    """Run the selected benchmarks (all by default)"""
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
+        print()
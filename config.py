@@ -10,11 +10,56 @@ BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
 DEFAULT_UNITS = "metric"  # metric (Celsius), imperial (Fahrenheit), kelvin
 DEFAULT_LANGUAGE = "en"   # Language for weather descriptions
 
+# Network settings
+REQUEST_TIMEOUT = 10             # Seconds to wait for a single API response
+HEDGE_DELAY = 1.0                # Seconds before a duplicate (hedged) request is sent, until latencies are known
+HEDGE_PERCENTILE = 95            # Observed latency percentile used as the adaptive hedge delay
+CIRCUIT_FAILURE_THRESHOLD = 5    # Consecutive upstream failures before failing fast
+CIRCUIT_RESET_TIMEOUT = 30       # Seconds to fail fast before probing the service again
+ROUTER_WINDOW = 50               # Recent lookups per provider used for latency and error rates
+ROUTER_MAX_ERROR_RATE = 0.5      # Providers above this error rate are only used as a last resort
+BULK_MAX_WORKERS = 8             # Concurrent lookups for bulk requests
+JSON_DECODER = "auto"            # auto (fastest installed), orjson, ujson or json
+CACHE_TTL = 600                  # Seconds a cached result counts as fresh (the API updates every ~10 minutes)
+
 # GUI Settings
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 500
 WINDOW_TITLE = "Weather App"
 
+# Change detection: differences at or below these are not reported as changes
+DELTA_TOLERANCES = {
+    "temperature": 0.2,     # degrees
+    "feels_like": 0.2,      # degrees
+    "pressure": 1,          # hPa
+    "wind_speed": 0.3,      # m/s (mph for imperial)
+    "wind_direction": 10,   # degrees
+}
+
+# Prefetch Settings
+SESSION_FILE = "~/.weather_app_session.json"  # Recent and pinned cities, loaded at startup
+RECENT_CITIES_LIMIT = 10         # Recent searches remembered in the session file
+PREFETCH_DELAY_MS = 400          # Typing pause before a matching city is fetched in the background
+PREFETCH_MIN_CHARS = 3           # Shortest typed text that can match a city
+PREFETCH_BUDGET = 20             # Speculative requests allowed per GUI session
+
+# Dashboard Settings
+DASHBOARD_TITLE = "Weather Dashboard"
+DASHBOARD_WIDTH = 1000
+DASHBOARD_HEIGHT = 700
+DASHBOARD_TILE_WIDTH = 180
+DASHBOARD_TILE_HEIGHT = 96
+DASHBOARD_TILE_GAP = 10
+DASHBOARD_REFRESH_INTERVAL = 300  # Seconds between automatic refreshes
+DASHBOARD_CITIES = [
+    "London", "Paris", "Berlin", "Madrid", "Rome", "Amsterdam", "Vienna", "Prague",
+    "Stockholm", "Oslo", "Helsinki", "Dublin", "Lisbon", "Athens", "Warsaw", "Istanbul",
+    "New York", "Los Angeles", "Chicago", "Toronto", "Mexico City", "Sao Paulo", "Buenos Aires",
+    "Lima", "Cairo", "Lagos", "Nairobi", "Johannesburg", "Dubai", "Mumbai", "Delhi",
+    "Bangkok", "Singapore", "Jakarta", "Hong Kong", "Shanghai", "Beijing", "Seoul",
+    "Tokyo", "Sydney", "Melbourne", "Auckland"
+]
+
 # Colors for GUI
 COLORS = {
     "primary": "#2196F3",
@@ -39,3 +84,19 @@ WEATHER_ICONS = {
     "fog": "🌫️",
     "haze": "🌫️"
 }
+
+# Icons for OpenWeatherMap condition code ranges: (first code, last code, icon)
+# https://openweathermap.org/weather-conditions
+CONDITION_CODE_ICONS = [
+    (200, 232, "⛈️"),   # Thunderstorm
+    (300, 321, "🌧️"),   # Drizzle
+    (500, 511, "🌧️"),   # Rain and freezing rain
+    (520, 531, "🌦️"),   # Shower rain
+    (600, 622, "❄️"),   # Snow and sleet
+    (701, 771, "🌫️"),   # Mist, smoke, haze, dust, fog, sand, ash, squalls
+    (781, 781, "🌪️"),   # Tornado
+    (800, 800, "☀️"),   # Clear sky
+    (801, 801, "🌤️"),   # Few clouds
+    (802, 802, "⛅"),   # Scattered clouds
+    (803, 804, "☁️"),   # Broken and overcast clouds
+]
@@ -3,7 +3,12 @@ Example usage of the Weather API module
 This file demonstrates how to use the WeatherAPI class programmatically
 """
 
-from weather_api import WeatherAPI
+import argparse
+import sys
+from weather_api import WeatherAPI, WeatherDeltaFeed, create_weather_api
+
+# Cassette options shared by all examples (see --record and --replay below)
+API_OPTIONS = {}
 
 
 def example_basic_usage():
@@ -11,7 +16,7 @@ def example_basic_usage():
     print("=== Basic Weather API Usage ===")
     
     # Initialize the API
-    weather_api = WeatherAPI()
+    weather_api = create_weather_api(**API_OPTIONS)
     
     # Fetch weather for a city
     city = "London"
@@ -31,7 +36,7 @@ def example_unit_conversion():
     """Example of temperature unit conversion"""
     print("\n=== Temperature Unit Conversion ===")
     
-    weather_api = WeatherAPI()
+    weather_api = create_weather_api(**API_OPTIONS)
     
     # Get weather in Celsius (metric)
     success, data = weather_api.get_weather_data("Tokyo", units="metric")
@@ -53,14 +58,14 @@ def example_multiple_cities():
     """Example of fetching weather for multiple cities"""
     print("\n=== Multiple Cities Weather ===")
     
-    weather_api = WeatherAPI()
+    weather_api = create_weather_api(**API_OPTIONS)
     cities = ["New York", "Paris", "Sydney", "Mumbai"]
     
     for city in cities:
         success, data = weather_api.get_weather_data(city)
         
         if success:
-            icon = WeatherAPI.get_weather_icon(data['description'])
+            icon = WeatherAPI.get_weather_icon(data['description'], data['condition_code'])
             print(f"{icon} {data['city']}: {data['temperature']}°C, {data['description']}")
         else:
             print(f"❌ {city}: {data['error']}")
@@ -70,7 +75,7 @@ def example_detailed_weather():
     """Example showing all available weather data"""
     print("\n=== Detailed Weather Information ===")
     
-    weather_api = WeatherAPI()
+    weather_api = create_weather_api(**API_OPTIONS)
     success, data = weather_api.get_weather_data("Berlin")
     
     if success:
@@ -82,7 +87,7 @@ def example_detailed_weather():
         print(f"🤔 Feels like: {data['feels_like']}°C")
         
         # Weather conditions
-        icon = WeatherAPI.get_weather_icon(data['description'])
+        icon = WeatherAPI.get_weather_icon(data['description'], data['condition_code'])
         print(f"{icon} Condition: {data['description']}")
         print(f"📊 Main: {data['main_condition']}")
         
@@ -109,7 +114,7 @@ def example_error_handling():
     """Example of proper error handling"""
     print("\n=== Error Handling Examples ===")
     
-    weather_api = WeatherAPI()
+    weather_api = create_weather_api(**API_OPTIONS)
     
     # Test with invalid city
     success, data = weather_api.get_weather_data("InvalidCityName123")
@@ -122,20 +127,49 @@ def example_error_handling():
         print(f"Expected error for empty city: {data['error']}")
     
     # Test with API key issue (if API key is not set)
-    weather_api_no_key = WeatherAPI(api_key="invalid_key")
+    # Cassettes are recorded without the API key, so replays can't check it
+    if API_OPTIONS.get("replay_path"):
+        print("Skipping invalid API key check: key checks can't be exercised from a cassette")
+        return
+    
+    weather_api_no_key = create_weather_api(api_key="invalid_key", **API_OPTIONS)
     success, data = weather_api_no_key.get_weather_data("London")
     if not success:
         print(f"Expected error for invalid API key: {data['error']}")
 
 
+def example_change_feed():
+    """Example of reporting only what changed between repeated lookups"""
+    print("\n=== Change Detection Feed ===")
+    
+    weather_api = create_weather_api(**API_OPTIONS)
+    cities = ["London", "Paris", "Tokyo"]
+    
+    # Events are written to stdout as NDJSON; subscribers get the same dicts
+    feed = WeatherDeltaFeed(stream=sys.stdout)
+    feed.subscribe(lambda event: None if event["full"] else
+                   print(f"🔔 {event['city']}: {', '.join(event['changes'])} changed"))
+    
+    for poll in range(2):
+        events = feed.poll(weather_api, cities)
+        print(f"Poll {poll + 1}: {len(events)} of {len(cities)} cities changed")
+
+
 if __name__ == "__main__":
     """Run all examples"""
+    parser = argparse.ArgumentParser(description="Run the Weather API examples.")
+    parser.add_argument("--record", metavar="CASSETTE", help="record API responses to a cassette file")
+    parser.add_argument("--replay", metavar="CASSETTE", help="run the examples from a recorded cassette")
+    args = parser.parse_args()
+    API_OPTIONS.update(record_path=args.record, replay_path=args.replay)
+    
     try:
         example_basic_usage()
         example_unit_conversion()
         example_multiple_cities()
         example_detailed_weather()
         example_error_handling()
+        example_change_feed()
         
         print("\n✅ All examples completed successfully!")
         
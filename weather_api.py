@@ -3,92 +3,673 @@ Shared weather API functionality for both CLI and GUI versions
 """
 
 import requests
+import functools
 import json
-from typing import Dict, Optional, Tuple
-from config import API_KEY, BASE_URL, DEFAULT_UNITS
+import math
+import mmap
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent import futures
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from config import (API_KEY, BASE_URL, DEFAULT_UNITS, REQUEST_TIMEOUT, HEDGE_DELAY,
+                    HEDGE_PERCENTILE, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT,
+                    ROUTER_WINDOW, ROUTER_MAX_ERROR_RATE, BULK_MAX_WORKERS, JSON_DECODER,
+                    DELTA_TOLERANCES, WEATHER_ICONS, CONDITION_CODE_ICONS)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; derived metrics fall back to plain Python
+    np = None
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON decoders, see JSON_DECODERS
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+# Available JSON decoders, fastest first; each takes the raw response bytes
+JSON_DECODERS = {}
+if orjson is not None:
+    JSON_DECODERS["orjson"] = orjson.loads
+if ujson is not None:
+    JSON_DECODERS["ujson"] = ujson.loads
+JSON_DECODERS["json"] = json.loads
+
+
+def get_json_decoder(name: str = JSON_DECODER) -> Tuple[str, Callable]:
+    """
+    Pick a JSON decoder by name
+    
+    Args:
+        name (str): "auto" for the fastest installed decoder, or a key of JSON_DECODERS
+        
+    Returns:
+        Tuple[str, Callable]: (name, loads) of the chosen decoder
+    """
+    if name == "auto":
+        name = next(iter(JSON_DECODERS))
+    if name not in JSON_DECODERS:
+        raise ValueError(f"JSON decoder '{name}' is not installed (available: {', '.join(JSON_DECODERS)})")
+    return name, JSON_DECODERS[name]
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream errors and probes for recovery"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent upstream
+        
+        While open, requests are rejected until the reset timeout has passed.
+        The circuit then becomes half-open and lets a single probe through;
+        its outcome decides whether the circuit closes or opens again.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+    
+    def record_success(self):
+        """Close the circuit after the upstream service answered"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        """Count an upstream failure, opening the circuit when the threshold is hit"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class WeatherProvider:
+    """
+    Base class for weather data providers
+    
+    A provider knows how to build the request URL for a lookup and how to
+    normalize its response into the common weather schema used by the
+    CLI and GUI (see OpenWeatherMapProvider.parse for the fields).
+    """
+    
+    name = "provider"
+    
+    def __init__(self, api_key: str, base_url: str, name: Optional[str] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        if name:
+            self.name = name
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+    
+    def is_configured(self) -> bool:
+        """Check whether the provider has an API key"""
+        return bool(self.api_key) and self.api_key != "your_api_key_here"
+    
+    def build_url(self, city: str, units: str) -> str:
+        """Build the request URL for a city lookup"""
+        raise NotImplementedError
+    
+    def parse(self, data: Dict) -> Dict:
+        """Normalize a decoded response into the common weather schema"""
+        raise NotImplementedError
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """OpenWeatherMap current weather endpoint"""
+    
+    name = "openweathermap"
+    
+    def __init__(self, api_key: str = API_KEY, base_url: str = BASE_URL, name: Optional[str] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        super().__init__(api_key, base_url, name, circuit_breaker)
+    
+    def build_url(self, city: str, units: str) -> str:
+        """Build the request URL for a city lookup"""
+        return f"{self.base_url}?q={city}&appid={self.api_key}&units={units}"
+    
+    def parse(self, data: Dict) -> Dict:
+        """
+        Parse and structure weather data from API response
+        
+        Args:
+            data (Dict): Raw API response data
+            
+        Returns:
+            Dict: Structured weather information
+        """
+        try:
+            # Look up each section once; unused sections (coord, base, dt, ...) are never touched
+            main = data.get("main", {})
+            wind = data.get("wind", {})
+            sys_info = data.get("sys", {})
+            condition = (data.get("weather") or [{}])[0]
+            visibility = data.get("visibility")
+            return {
+                "city": data.get("name", "Unknown"),
+                "country": sys_info.get("country", ""),
+                "temperature": round(main.get("temp", 0), 1),
+                "feels_like": round(main.get("feels_like", 0), 1),
+                "humidity": main.get("humidity", 0),
+                "pressure": main.get("pressure", 0),
+                "description": condition.get("description", "").title(),
+                "main_condition": condition.get("main", ""),
+                "condition_code": condition.get("id", 0),
+                "wind_speed": wind.get("speed", 0),
+                "wind_direction": wind.get("deg", 0),
+                "visibility": visibility / 1000 if visibility else 0,  # Convert to km
+                "cloudiness": data.get("clouds", {}).get("all", 0),
+                "sunrise": sys_info.get("sunrise", 0),
+                "sunset": sys_info.get("sunset", 0),
+            }
+        except Exception as e:
+            return {"error": f"Error parsing weather data: {str(e)}"}
+
+
+class ProviderRouter:
+    """Ranks providers by recent error rate and latency"""
+    
+    def __init__(self, providers: List[WeatherProvider], window: int = ROUTER_WINDOW,
+                 max_error_rate: float = ROUTER_MAX_ERROR_RATE):
+        self.providers = list(providers)
+        self.max_error_rate = max_error_rate
+        # Windows are keyed by provider object, so providers sharing a name stay separate
+        self._latencies = {id(provider): deque(maxlen=window) for provider in self.providers}
+        self._outcomes = {id(provider): deque(maxlen=window) for provider in self.providers}
+        self._lock = threading.Lock()
+    
+    def record_latency(self, provider: WeatherProvider, latency: float):
+        """Record the latency of a response from a provider"""
+        with self._lock:
+            self._latencies[id(provider)].append(latency)
+    
+    def record_outcome(self, provider: WeatherProvider, ok: bool):
+        """Record whether a lookup against a provider succeeded"""
+        with self._lock:
+            self._outcomes[id(provider)].append(ok)
+    
+    def error_rate(self, provider: WeatherProvider) -> float:
+        """Fraction of failed lookups in the rolling window"""
+        with self._lock:
+            outcomes = list(self._outcomes[id(provider)])
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+    
+    def latency_percentile(self, provider: WeatherProvider, percentile: float,
+                           min_samples: int = 1) -> Optional[float]:
+        """Latency percentile in the rolling window, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._latencies[id(provider)])
+        if not samples or len(samples) < min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+    
+    def ranked(self) -> List[WeatherProvider]:
+        """
+        Providers in the order they should be tried
+        
+        Healthy providers come first, fastest median latency first. Providers
+        without any samples yet sort ahead so they get measured.
+        """
+        if len(self.providers) == 1:
+            return list(self.providers)
+        
+        def sort_key(provider):
+            median = self.latency_percentile(provider, 50)
+            return (self.error_rate(provider) > self.max_error_rate,
+                    median if median is not None else 0.0)
+        return sorted(self.providers, key=sort_key)
+    
+    def stats(self) -> List[Dict]:
+        """Summary of the rolling window for each provider, in provider order"""
+        summary = []
+        for provider in self.providers:
+            with self._lock:
+                lookups = len(self._outcomes[id(provider)])
+            summary.append({
+                "name": provider.name,
+                "lookups": lookups,
+                "error_rate": self.error_rate(provider),
+                "median_latency": self.latency_percentile(provider, 50),
+                "circuit": provider.circuit_breaker.state,
+            })
+        return summary
+
+
+class HTTPTransport:
+    """Sends lookups over the network"""
+    
+    def get(self, url: str, timeout: float):
+        """Perform a GET request and return the response"""
+        return requests.get(url, timeout=timeout)
+
+
+def cassette_key(url: str) -> str:
+    """Key a request URL for cassettes, leaving out the API key"""
+    return re.sub(r"([?&])appid=[^&]*&?", r"\1", url).rstrip("?&")
+
+
+class RecordingTransport:
+    """
+    Records every response to an NDJSON cassette
+    
+    Each line holds the request URL (without the API key), the status code,
+    the time the response took and the raw response body.
+    """
+    
+    def __init__(self, path: str, transport=None):
+        self.path = path
+        self.transport = transport or HTTPTransport()
+        self._lock = threading.Lock()
+    
+    def get(self, url: str, timeout: float):
+        """Perform a GET request through the wrapped transport and record it"""
+        start = time.perf_counter()
+        response = self.transport.get(url, timeout=timeout)
+        entry = {
+            "url": cassette_key(url),
+            "status": response.status_code,
+            "elapsed": round(time.perf_counter() - start, 6),
+            "body": response.text,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as cassette:
+                cassette.write(line)
+        return response
+
+
+_CASSETTE_URL_PREFIX = re.compile(r'\s*\{\s*"url"\s*:\s*')
+
+
+class CassetteResponse:
+    """Response served from a cassette"""
+    
+    def __init__(self, status_code: int, content: bytes, elapsed: float):
+        self.status_code = status_code
+        self.content = content
+        self.elapsed = elapsed
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+    
+    def json(self):
+        return json.loads(self.content)
+
+
+class CassetteMissError(LookupError):
+    """Raised by ReplayTransport for a URL the cassette has no response for"""
+
+
+class ReplayTransport:
+    """
+    Serves responses from a recorded NDJSON cassette
+    
+    The cassette is memory-mapped and indexed by URL when it is opened;
+    entries are only decoded the first time they are served. Repeated
+    lookups of the same URL cycle through its recorded responses; URLs
+    that were never recorded raise CassetteMissError.
+    
+    Args:
+        path (str): Cassette written by RecordingTransport
+        latency_scale (float): Multiple of the recorded response time to
+            sleep before answering; 0 replays as fast as possible
+    """
+    
+    def __init__(self, path: str, latency_scale: float = 0.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self._responses = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        with open(path, "rb") as cassette:
+            if os.fstat(cassette.fileno()).st_size:
+                self._map = mmap.mmap(cassette.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._map = b""
+        self._index = self._build_index()
+    
+    def _build_index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """Map each recorded URL to the (start, end) offsets of its lines"""
+        index = {}
+        decoder = json.JSONDecoder()
+        start = 0
+        size = len(self._map)
+        while start < size:
+            end = self._map.find(b"\n", start)
+            if end == -1:
+                end = size
+            line = self._map[start:end].decode("utf-8")
+            if line.strip():
+                # Lines start with {"url": ..., so only the URL needs decoding here
+                url, _ = decoder.raw_decode(line, _CASSETTE_URL_PREFIX.match(line).end())
+                index.setdefault(url, []).append((start, end))
+            start = end + 1
+        return index
+    
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+    
+    def get(self, url: str, timeout: float):
+        """Return the next recorded response for a URL"""
+        key = cassette_key(url)
+        entries = self._index.get(key)
+        if not entries:
+            raise CassetteMissError(f"No recorded response for {key}")
+        
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = (position + 1) % len(entries)
+        
+        offsets = entries[position]
+        response = self._responses.get(offsets)
+        if response is None:
+            entry = json.loads(self._map[offsets[0]:offsets[1]])
+            response = CassetteResponse(entry["status"], entry["body"].encode("utf-8"), entry["elapsed"])
+            self._responses[offsets] = response
+        
+        if self.latency_scale:
+            time.sleep(min(response.elapsed * self.latency_scale, timeout))
+        return response
+
+
+class WeatherCache(dict):
+    """Cache of parsed results keyed by (city, units) that remembers when each was stored"""
+    
+    def __init__(self):
+        super().__init__()
+        self._stored_at = {}
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._stored_at[key] = time.monotonic()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._stored_at.pop(key, None)
+    
+    def fresh(self, key, max_age: float) -> Optional[Dict]:
+        """Return the cached result if it is younger than max_age seconds"""
+        stored_at = self._stored_at.get(key)
+        if stored_at is None or time.monotonic() - stored_at > max_age:
+            return None
+        return self.get(key)
+    
+    @staticmethod
+    def key(city: str, units: str) -> Tuple[str, str]:
+        """Cache key for a city lookup"""
+        return city.strip().lower(), units
 
 
 class WeatherAPI:
     """Handles all weather API interactions"""
     
-    def __init__(self, api_key: str = API_KEY):
+    def __init__(self, api_key: str = API_KEY, base_url: str = BASE_URL,
+                 timeout: float = REQUEST_TIMEOUT, hedge: bool = False,
+                 cache: Optional[Dict] = None,
+                 providers: Optional[List[WeatherProvider]] = None,
+                 transport=None, json_decoder: str = JSON_DECODER):
+        """
+        Args:
+            api_key (str): OpenWeatherMap API key
+            base_url (str): Endpoint for current weather lookups
+            timeout (float): Seconds to wait for a single response
+            hedge (bool): Send a duplicate request when the first one is slower
+                than the observed p95 latency, and use whichever answers first
+            cache (Dict): Optional mapping of (city, units) to parsed results,
+                used to serve stale data while every provider's circuit is open;
+                a WeatherCache can also answer fresh lookups (see max_age)
+            providers (List[WeatherProvider]): Providers to route lookups across;
+                defaults to OpenWeatherMap with api_key and base_url
+            transport: Object whose get(url, timeout) returns a response;
+                defaults to HTTPTransport (see also RecordingTransport and ReplayTransport)
+            json_decoder (str): JSON decoder for response bodies, see get_json_decoder
+        """
         self.api_key = api_key
-        self.base_url = BASE_URL
+        self.base_url = base_url
+        self.timeout = timeout
+        self.hedge = hedge
+        self.cache = cache
+        self.providers = providers or [OpenWeatherMapProvider(api_key, base_url)]
+        self.router = ProviderRouter(self.providers)
+        self.transport = transport or HTTPTransport()
+        self.json_decoder, self._decode = get_json_decoder(json_decoder)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+    
+    def close(self):
+        """Shut down the thread pool used for hedged requests, if one was started"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
     
-    def get_weather_data(self, city: str, units: str = DEFAULT_UNITS) -> Tuple[bool, Dict]:
+    def get_weather_data(self, city: str, units: str = DEFAULT_UNITS,
+                         max_age: Optional[float] = None) -> Tuple[bool, Dict]:
         """
         Fetch weather data for a given city
         
+        Providers are tried in the router's order; lookups fail over to the
+        next provider on network errors, server errors and rejected keys.
+        
         Args:
             city (str): City name to get weather for
             units (str): Temperature units (metric, imperial, kelvin)
+            max_age (float): Answer from the cache, without a request, if it holds
+                a result younger than this many seconds (needs a WeatherCache)
             
         Returns:
             Tuple[bool, Dict]: (success, data) where data contains weather info or error message
         """
-        if not self.api_key or self.api_key == "your_api_key_here":
+        providers = [provider for provider in self.router.ranked() if provider.is_configured()]
+        if not providers:
             return False, {"error": "Please set your API key in config.py"}
         
         if not city.strip():
             return False, {"error": "Please enter a valid city name"}
         
+        cache_key = WeatherCache.key(city, units)
+        if max_age is not None and isinstance(self.cache, WeatherCache):
+            cached = self.cache.fresh(cache_key, max_age)
+            if cached is not None:
+                return True, cached
+        
+        result = None
+        for provider in providers:
+            if not provider.circuit_breaker.allow_request():
+                continue
+            
+            try:
+                success, data, failover = self._fetch_from(provider, city, units)
+            except CassetteMissError:
+                # Not a provider failure, so the breaker and router windows are left alone
+                return False, {"error": f"City '{city}' is not in the replayed cassette."}
+            self.router.record_outcome(provider, success or not failover)
+            if success:
+                if self.cache is not None:
+                    self.cache[cache_key] = data
+                return True, data
+            
+            result = (False, data)
+            if not failover:
+                break
+        
+        return result or self._serve_stale(cache_key)
+    
+    def get_bulk_weather_data(self, cities: Sequence[str], units: str = DEFAULT_UNITS,
+                              max_workers: int = BULK_MAX_WORKERS) -> Dict[str, Tuple[bool, Dict]]:
+        """
+        Fetch weather data for many cities using a shared pool of worker threads
+        
+        Args:
+            cities (Sequence[str]): City names to get weather for
+            units (str): Temperature units (metric, imperial, kelvin)
+            max_workers (int): Maximum number of lookups in flight at once
+            
+        Returns:
+            Dict[str, Tuple[bool, Dict]]: (success, data) for each city, in the order given
+        """
+        unique_cities = list(dict.fromkeys(cities))
+        if not unique_cities:
+            return {}
+        with futures.ThreadPoolExecutor(max_workers=min(max_workers, len(unique_cities)),
+                                        thread_name_prefix="weather-bulk") as executor:
+            results = executor.map(lambda city: self.get_weather_data(city, units), unique_cities)
+            return dict(zip(unique_cities, results))
+    
+    def _fetch_from(self, provider: WeatherProvider, city: str, units: str) -> Tuple[bool, Dict, bool]:
+        """
+        Look up a city with a single provider
+        
+        Returns:
+            Tuple[bool, Dict, bool]: (success, data, failover) where failover tells
+            whether another provider might still answer the lookup
+            
+        Raises:
+            CassetteMissError: The replayed cassette has no response for the lookup
+        """
         try:
             # Construct API URL
-            url = f"{self.base_url}?q={city.strip()}&appid={self.api_key}&units={units}"
+            url = provider.build_url(city.strip(), units)
             
             # Make API request
-            response = requests.get(url, timeout=10)
+            try:
+                response = self._send(provider, url)
+            except CassetteMissError:
+                raise
+            except Exception:
+                provider.circuit_breaker.record_failure()
+                raise
+            
+            if response.status_code >= 500:
+                provider.circuit_breaker.record_failure()
+            else:
+                provider.circuit_breaker.record_success()
             
             if response.status_code == 200:
-                data = response.json()
-                return True, self._parse_weather_data(data)
+                # Decode straight from the response bytes, skipping the text decoding step
+                data = self._decode(response.content)
+                weather = provider.parse(data)
+                if "error" in weather:
+                    return False, weather, True
+                return True, weather, False
             elif response.status_code == 404:
-                return False, {"error": f"City '{city}' not found. Please check the spelling."}
+                return False, {"error": f"City '{city}' not found. Please check the spelling."}, False
             elif response.status_code == 401:
-                return False, {"error": "Invalid API key. Please check your configuration."}
+                return False, {"error": "Invalid API key. Please check your configuration."}, True
             else:
-                return False, {"error": f"API error: {response.status_code}"}
+                return False, {"error": f"API error: {response.status_code}"}, True
                 
         except requests.exceptions.Timeout:
-            return False, {"error": "Request timed out. Please check your internet connection."}
+            return False, {"error": "Request timed out. Please check your internet connection."}, True
         except requests.exceptions.ConnectionError:
-            return False, {"error": "Connection error. Please check your internet connection."}
+            return False, {"error": "Connection error. Please check your internet connection."}, True
         except requests.exceptions.RequestException as e:
-            return False, {"error": f"Network error: {str(e)}"}
-        except json.JSONDecodeError:
-            return False, {"error": "Invalid response from weather service."}
+            return False, {"error": f"Network error: {str(e)}"}, True
+        except ValueError:  # Decode errors from every JSON backend are ValueErrors
+            return False, {"error": "Invalid response from weather service."}, True
+        except CassetteMissError:
+            raise
         except Exception as e:
-            return False, {"error": f"Unexpected error: {str(e)}"}
+            return False, {"error": f"Unexpected error: {str(e)}"}, True
+    
+    def _serve_stale(self, cache_key: Tuple[str, str]) -> Tuple[bool, Dict]:
+        """Answer from the cache while every provider's circuit breaker is open"""
+        cached = self.cache.get(cache_key) if self.cache is not None else None
+        if cached is not None:
+            return True, {**cached, "stale": True}
+        return False, {"error": "Weather service is temporarily unavailable. Please try again shortly."}
     
-    def _parse_weather_data(self, data: Dict) -> Dict:
+    def _send(self, provider: WeatherProvider, url: str):
         """
-        Parse and structure weather data from API response
+        Send a GET request, hedging it with a duplicate when enabled
         
-        Args:
-            data (Dict): Raw API response data
-            
-        Returns:
-            Dict: Structured weather information
+        The duplicate is only sent if the first request has not answered
+        within the adaptive hedge delay, so at most a few percent of
+        lookups cost an extra request. The delay is timed from when the
+        first request starts, not from when it was queued for a worker.
         """
+        if not self.hedge:
+            return self._timed_get(provider, url)
+        
+        executor = self._get_executor()
+        started = threading.Event()
+        primary = executor.submit(self._timed_get, provider, url, started)
+        started.wait(self.timeout)
         try:
-            return {
-                "city": data.get("name", "Unknown"),
-                "country": data.get("sys", {}).get("country", ""),
-                "temperature": round(data.get("main", {}).get("temp", 0), 1),
-                "feels_like": round(data.get("main", {}).get("feels_like", 0), 1),
-                "humidity": data.get("main", {}).get("humidity", 0),
-                "pressure": data.get("main", {}).get("pressure", 0),
-                "description": data.get("weather", [{}])[0].get("description", "").title(),
-                "main_condition": data.get("weather", [{}])[0].get("main", ""),
-                "wind_speed": data.get("wind", {}).get("speed", 0),
-                "wind_direction": data.get("wind", {}).get("deg", 0),
-                "visibility": data.get("visibility", 0) / 1000 if data.get("visibility") else 0,  # Convert to km
-                "cloudiness": data.get("clouds", {}).get("all", 0),
-                "sunrise": data.get("sys", {}).get("sunrise", 0),
-                "sunset": data.get("sys", {}).get("sunset", 0),
-            }
-        except Exception as e:
-            return {"error": f"Error parsing weather data: {str(e)}"}
+            return primary.result(timeout=self.hedge_delay(provider))
+        except futures.TimeoutError:
+            pass
+        
+        pending = {primary, executor.submit(self._timed_get, provider, url)}
+        deadline = time.monotonic() + self.timeout
+        error = None
+        while pending:
+            done, pending = futures.wait(pending,
+                                         timeout=max(0.0, deadline - time.monotonic()),
+                                         return_when=futures.FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error or requests.exceptions.Timeout("Hedged request timed out")
+    
+    def _timed_get(self, provider: WeatherProvider, url: str, started: Optional[threading.Event] = None):
+        """Perform a single GET request and record its latency"""
+        if started is not None:
+            started.set()
+        start = time.perf_counter()
+        response = self.transport.get(url, timeout=self.timeout)
+        self.router.record_latency(provider, time.perf_counter() - start)
+        return response
+    
+    def _get_executor(self) -> futures.ThreadPoolExecutor:
+        """Lazily create the thread pool used for hedged requests"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="weather-hedge")
+            return self._executor
+    
+    def hedge_delay(self, provider: WeatherProvider) -> float:
+        """Delay before hedging: the provider's observed latency percentile, or the configured default"""
+        delay = self.router.latency_percentile(provider, HEDGE_PERCENTILE, min_samples=20)
+        return HEDGE_DELAY if delay is None else delay
     
     @staticmethod
     def celsius_to_fahrenheit(celsius: float) -> float:
@@ -101,25 +682,366 @@ class WeatherAPI:
         return round((fahrenheit - 32) * 5/9, 1)
     
     @staticmethod
-    def get_weather_icon(description: str) -> str:
-        """Get weather icon emoji based on description"""
-        from config import WEATHER_ICONS
-        
-        description_lower = description.lower()
-        for condition, icon in WEATHER_ICONS.items():
-            if condition in description_lower:
+    def get_weather_icon(description: str, condition_code: Optional[int] = None) -> str:
+        """Get weather icon emoji from the condition code, or the description if the code is unknown"""
+        if condition_code is not None and 0 <= condition_code < len(CONDITION_ICON_TABLE):
+            icon = CONDITION_ICON_TABLE[condition_code]
+            if icon is not None:
                 return icon
+        return _icon_for_description(description)
+    
+    @staticmethod
+    def get_weather_icons(condition_codes: Sequence[int],
+                          descriptions: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Get weather icons for a whole column of results at once
+        
+        Args:
+            condition_codes (Sequence[int]): Condition codes from the parsed results
+            descriptions (Sequence[str]): Matching descriptions, used for unknown codes
+            
+        Returns:
+            List[str]: One icon per condition code
+        """
+        table = CONDITION_ICON_TABLE
+        size = len(table)
+        icons = [table[code] if 0 <= code < size else None for code in condition_codes]
+        
+        for i, icon in enumerate(icons):
+            if icon is None:
+                icons[i] = _icon_for_description(descriptions[i] if descriptions is not None else "")
+        return icons
+
+
+class WeatherDeltaFeed:
+    """
+    Turns repeated lookups into events holding only the fields that changed
+    
+    The feed keeps the last reported observation per city and units. Numeric
+    fields listed in the tolerances only count as changed once they move by
+    more than their tolerance from the last reported value, so slow drift is
+    still reported once it adds up.
+    
+    Events are dicts like {"city": "London", "units": "metric", "time": ...,
+    "full": False, "changes": {"temperature": 15.1}}; the first event for a
+    city has "full": True and carries every field. They are passed to
+    subscribers and, if a stream is given, written to it as NDJSON lines.
+    
+    Args:
+        tolerances (Dict): Per-field tolerances, merged over DELTA_TOLERANCES
+        stream: Optional text file-like object for NDJSON events
+    """
+    
+    # Fields describing the lookup rather than the weather
+    IGNORED_FIELDS = {"stale"}
+    
+    def __init__(self, tolerances: Optional[Dict[str, float]] = None, stream=None):
+        self.tolerances = {**DELTA_TOLERANCES, **(tolerances or {})}
+        self.stream = stream
+        self.last = {}
+        self.subscribers = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[Dict], None]:
+        """Call callback with every event; returns the callback for later unsubscribe"""
+        self.subscribers.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        """Stop sending events to a callback"""
+        self.subscribers.remove(callback)
+    
+    def diff(self, previous: Optional[Dict], current: Dict) -> Dict:
+        """Fields of current that differ from previous beyond their tolerance"""
+        if previous is None:
+            return {field: value for field, value in current.items() if field not in self.IGNORED_FIELDS}
         
-        # Default icons based on keywords
-        if any(word in description_lower for word in ["sun", "clear"]):
-            return "☀️"
-        elif any(word in description_lower for word in ["cloud", "overcast"]):
-            return "☁️"
-        elif any(word in description_lower for word in ["rain", "drizzle"]):
-            return "🌧️"
-        elif "snow" in description_lower:
-            return "❄️"
-        elif any(word in description_lower for word in ["storm", "thunder"]):
-            return "⛈️"
+        changes = {}
+        for field, value in current.items():
+            if field in self.IGNORED_FIELDS:
+                continue
+            old = previous.get(field)
+            tolerance = self.tolerances.get(field)
+            if (tolerance is not None and isinstance(value, (int, float))
+                    and isinstance(old, (int, float))):
+                if round(abs(value - old), 6) > tolerance:
+                    changes[field] = value
+            elif value != old:
+                changes[field] = value
+        return changes
+    
+    def update(self, city: str, data: Dict, units: str = DEFAULT_UNITS) -> Optional[Dict]:
+        """
+        Compare a new lookup result with the last reported one
+        
+        Returns:
+            Optional[Dict]: The emitted event, or None if nothing changed
+        """
+        key = WeatherCache.key(city, units)
+        with self._lock:
+            previous = self.last.get(key)
+            changes = self.diff(previous, data)
+            if not changes:
+                return None
+            self.last[key] = {**(previous or {}), **changes}
+        
+        event = {"city": city, "units": units, "time": time.time(),
+                 "full": previous is None, "changes": changes}
+        self.emit(event)
+        return event
+    
+    def poll(self, weather_api: "WeatherAPI", cities: Sequence[str], units: str = DEFAULT_UNITS) -> List[Dict]:
+        """
+        Look up cities with one bulk request and report what changed
+        
+        Failed lookups are skipped; they say nothing about the weather.
+        
+        Returns:
+            List[Dict]: Events for the cities that changed
+        """
+        events = []
+        for city, (success, data) in weather_api.get_bulk_weather_data(cities, units).items():
+            if success:
+                event = self.update(city, data, units)
+                if event is not None:
+                    events.append(event)
+        return events
+    
+    def emit(self, event: Dict):
+        """Send an event to every subscriber and the NDJSON stream"""
+        for callback in list(self.subscribers):
+            callback(event)
+        if self.stream is not None:
+            with self._lock:
+                self.stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+                self.stream.flush()
+    
+    def forget(self, city: str, units: str = DEFAULT_UNITS):
+        """Drop a city's last observation, so its next update is a full event"""
+        with self._lock:
+            self.last.pop(WeatherCache.key(city, units), None)
+
+
+def create_weather_api(record_path: Optional[str] = None, replay_path: Optional[str] = None,
+                       latency_scale: float = 0.0, **kwargs) -> WeatherAPI:
+    """
+    Create a WeatherAPI that optionally records to or replays from a cassette
+    
+    Replaying needs no API key or network connection, so a placeholder key
+    is used when none has been configured.
+    """
+    if replay_path:
+        if kwargs.get("api_key", API_KEY) in ("", "your_api_key_here"):
+            kwargs["api_key"] = "cassette"
+        return WeatherAPI(transport=ReplayTransport(replay_path, latency_scale), **kwargs)
+    if record_path:
+        return WeatherAPI(transport=RecordingTransport(record_path), **kwargs)
+    return WeatherAPI(**kwargs)
+
+
+def _build_condition_icon_table() -> List[Optional[str]]:
+    """Expand CONDITION_CODE_ICONS into a list indexed by condition code"""
+    table = [None] * 1000
+    for first, last, icon in CONDITION_CODE_ICONS:
+        for code in range(first, last + 1):
+            table[code] = icon
+    return table
+
+
+CONDITION_ICON_TABLE = _build_condition_icon_table()
+
+
+@functools.lru_cache(maxsize=1024)
+def _icon_for_description(description: str) -> str:
+    """Get weather icon emoji based on description"""
+    description_lower = description.lower()
+    for condition, icon in WEATHER_ICONS.items():
+        if condition in description_lower:
+            return icon
+    
+    # Default icons based on keywords
+    if any(word in description_lower for word in ["sun", "clear"]):
+        return "☀️"
+    elif any(word in description_lower for word in ["cloud", "overcast"]):
+        return "☁️"
+    elif any(word in description_lower for word in ["rain", "drizzle"]):
+        return "🌧️"
+    elif "snow" in description_lower:
+        return "❄️"
+    elif any(word in description_lower for word in ["storm", "thunder"]):
+        return "⛈️"
+    else:
+        return "🌤️"  # Default icon
+
+
+# Derived metrics
+#
+# Computed from the parsed weather fields, either for a whole column of
+# observations at once (compute_derived_metrics) or for a single result
+# (derived_metrics). Temperatures are returned in the units they were
+# requested in; daylight length is in hours.
+
+DERIVED_METRICS = ("dew_point", "heat_index", "wind_chill", "beaufort", "wind_compass", "daylight_hours")
+
+# Upper wind speed bounds (m/s) of Beaufort forces 0-11; anything above is force 12
+BEAUFORT_LIMITS = (0.5, 1.6, 3.4, 5.5, 8.0, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7)
+
+COMPASS_POINTS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+                  "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
+MPH_TO_MS = 0.44704
+
+
+def compute_derived_metrics(observations: List[Dict], units: str = DEFAULT_UNITS) -> Dict[str, list]:
+    """
+    Compute derived metrics for many parsed weather results in one pass
+    
+    Args:
+        observations (List[Dict]): Results from WeatherAPI.get_weather_data
+        units (str): Units the observations were fetched in
+        
+    Returns:
+        Dict[str, list]: One column per name in DERIVED_METRICS, aligned with observations
+    """
+    columns = {field: [record.get(field, 0) for record in observations]
+               for field in ("temperature", "humidity", "wind_speed", "wind_direction", "sunrise", "sunset")}
+    return compute_derived_columns(units=units, **columns)
+
+
+def compute_derived_columns(temperature, humidity, wind_speed, wind_direction, sunrise, sunset,
+                            units: str = DEFAULT_UNITS) -> Dict[str, list]:
+    """
+    Compute derived metrics from columns of observations
+    
+    Uses NumPy when it is installed and a plain Python loop otherwise.
+    All arguments are equal-length sequences (lists or arrays).
+    
+    Returns:
+        Dict[str, list]: One column per name in DERIVED_METRICS
+    """
+    if np is not None:
+        return _derive_numpy(temperature, humidity, wind_speed, wind_direction, sunrise, sunset, units)
+    return _derive_python(temperature, humidity, wind_speed, wind_direction, sunrise, sunset, units)
+
+
+def attach_derived_metrics(observations: List[Dict], units: str = DEFAULT_UNITS) -> List[Dict]:
+    """Add the derived metrics to each parsed weather result in place"""
+    columns = compute_derived_metrics(observations, units)
+    for name, values in columns.items():
+        for record, value in zip(observations, values):
+            record[name] = value
+    return observations
+
+
+def derived_metrics(weather_data: Dict, units: str = DEFAULT_UNITS) -> Dict:
+    """Compute the derived metrics for a single parsed weather result"""
+    columns = _derive_python([weather_data.get("temperature", 0)], [weather_data.get("humidity", 0)],
+                             [weather_data.get("wind_speed", 0)], [weather_data.get("wind_direction", 0)],
+                             [weather_data.get("sunrise", 0)], [weather_data.get("sunset", 0)], units)
+    return {name: values[0] for name, values in columns.items()}
+
+
+def _to_celsius(temperature: float, units: str) -> float:
+    if units == "imperial":
+        return (temperature - 32) * 5 / 9
+    if units in ("kelvin", "standard"):
+        return temperature - 273.15
+    return temperature
+
+
+def _from_celsius(celsius: float, units: str) -> float:
+    if units == "imperial":
+        return celsius * 9 / 5 + 32
+    if units in ("kelvin", "standard"):
+        return celsius + 273.15
+    return celsius
+
+
+def _derive_python(temperature, humidity, wind_speed, wind_direction, sunrise, sunset, units):
+    """Plain Python implementation of compute_derived_columns"""
+    speed_factor = MPH_TO_MS if units == "imperial" else 1.0
+    columns = {name: [] for name in DERIVED_METRICS}
+    
+    for temp, rh, speed, degrees, rise, set_ in zip(temperature, humidity, wind_speed,
+                                                     wind_direction, sunrise, sunset):
+        temp_c = _to_celsius(float(temp), units)
+        speed_ms = speed * speed_factor
+        
+        # Dew point (Magnus formula)
+        gamma = math.log(max(rh, 1) / 100) + 17.62 * temp_c / (243.12 + temp_c)
+        dew_point_c = 243.12 * gamma / (17.62 - gamma)
+        
+        # Heat index (NOAA Rothfusz regression in Fahrenheit, applied at 80°F and above; cooler air returns the air temperature)
+        temp_f = temp_c * 9 / 5 + 32
+        heat_f = temp_f
+        if temp_f >= 80:
+            heat_f = (-42.379 + 2.04901523 * temp_f + 10.14333127 * rh
+                      - 0.22475541 * temp_f * rh - 0.00683783 * temp_f ** 2
+                      - 0.05481717 * rh ** 2 + 0.00122874 * temp_f ** 2 * rh
+                      + 0.00085282 * temp_f * rh ** 2 - 0.00000199 * temp_f ** 2 * rh ** 2)
+            if rh < 13 and 80 <= temp_f <= 112:
+                heat_f -= (13 - rh) / 4 * math.sqrt((17 - abs(temp_f - 95)) / 17)
+            elif rh > 85 and 80 <= temp_f <= 87:
+                heat_f += (rh - 85) / 10 * (87 - temp_f) / 5
+        
+        # Wind chill (North American formula, wind speed in km/h)
+        speed_kmh = speed_ms * 3.6
+        if temp_c <= 10 and speed_kmh > 4.8:
+            chill_c = (13.12 + 0.6215 * temp_c - 11.37 * speed_kmh ** 0.16
+                       + 0.3965 * temp_c * speed_kmh ** 0.16)
         else:
-            return "🌤️"  # Default icon
+            chill_c = temp_c
+        
+        columns["dew_point"].append(round(_from_celsius(dew_point_c, units), 1))
+        columns["heat_index"].append(round(_from_celsius((heat_f - 32) * 5 / 9, units), 1))
+        columns["wind_chill"].append(round(_from_celsius(chill_c, units), 1))
+        columns["beaufort"].append(sum(speed_ms >= limit for limit in BEAUFORT_LIMITS))
+        columns["wind_compass"].append(COMPASS_POINTS[int((degrees % 360) / 22.5 + 0.5) % 16])
+        columns["daylight_hours"].append(round((set_ - rise) / 3600, 2) if rise and set_ else 0)
+    
+    return columns
+
+
+def _derive_numpy(temperature, humidity, wind_speed, wind_direction, sunrise, sunset, units):
+    """NumPy implementation of compute_derived_columns"""
+    temp_c = _to_celsius(np.asarray(temperature, dtype=float), units)
+    rh = np.asarray(humidity, dtype=float)
+    speed_ms = np.asarray(wind_speed, dtype=float) * (MPH_TO_MS if units == "imperial" else 1.0)
+    degrees = np.asarray(wind_direction, dtype=float)
+    rise = np.asarray(sunrise, dtype=float)
+    set_ = np.asarray(sunset, dtype=float)
+    
+    # Dew point (Magnus formula)
+    gamma = np.log(np.maximum(rh, 1) / 100) + 17.62 * temp_c / (243.12 + temp_c)
+    dew_point_c = 243.12 * gamma / (17.62 - gamma)
+    
+    # Heat index (NOAA Rothfusz regression in Fahrenheit, applied at 80°F and above; cooler air returns the air temperature)
+    temp_f = temp_c * 9 / 5 + 32
+    regression_f = (-42.379 + 2.04901523 * temp_f + 10.14333127 * rh
+                    - 0.22475541 * temp_f * rh - 0.00683783 * temp_f ** 2
+                    - 0.05481717 * rh ** 2 + 0.00122874 * temp_f ** 2 * rh
+                    + 0.00085282 * temp_f * rh ** 2 - 0.00000199 * temp_f ** 2 * rh ** 2)
+    dry = (rh < 13) & (temp_f >= 80) & (temp_f <= 112)
+    humid = (rh > 85) & (temp_f >= 80) & (temp_f <= 87)
+    regression_f -= np.where(dry, (13 - rh) / 4 * np.sqrt(np.clip(17 - np.abs(temp_f - 95), 0, None) / 17), 0)
+    regression_f += np.where(humid, (rh - 85) / 10 * (87 - temp_f) / 5, 0)
+    heat_f = np.where(temp_f >= 80, regression_f, temp_f)
+    
+    # Wind chill (North American formula, wind speed in km/h)
+    speed_kmh = speed_ms * 3.6
+    chill_c = np.where((temp_c <= 10) & (speed_kmh > 4.8),
+                       13.12 + 0.6215 * temp_c - 11.37 * speed_kmh ** 0.16
+                       + 0.3965 * temp_c * speed_kmh ** 0.16,
+                       temp_c)
+    
+    compass_index = ((degrees % 360) / 22.5 + 0.5).astype(int) % 16
+    daylight = np.where((rise > 0) & (set_ > 0), (set_ - rise) / 3600, 0)
+    
+    return {
+        "dew_point": np.round(_from_celsius(dew_point_c, units), 1).tolist(),
+        "heat_index": np.round(_from_celsius((heat_f - 32) * 5 / 9, units), 1).tolist(),
+        "wind_chill": np.round(_from_celsius(chill_c, units), 1).tolist(),
+        "beaufort": np.searchsorted(BEAUFORT_LIMITS, speed_ms, side="right").tolist(),
+        "wind_compass": np.array(COMPASS_POINTS)[compass_index].tolist(),
+        "daylight_hours": np.round(daylight, 2).tolist(),
+    }
@@ -3,8 +3,9 @@ Beginner Weather App - Command Line Interface
 A simple command-line weather application that fetches and displays current weather data.
 """
 
+import argparse
 import sys
-from weather_api import WeatherAPI
+from weather_api import WeatherAPI, create_weather_api, derived_metrics
 
 
 def display_weather(weather_data):
@@ -20,12 +21,14 @@ def display_weather(weather_data):
     print(f"🤔 Feels like: {weather_data['feels_like']}°C")
     
     # Weather conditions
-    icon = WeatherAPI.get_weather_icon(weather_data['description'])
+    icon = WeatherAPI.get_weather_icon(weather_data['description'], weather_data['condition_code'])
     print(f"{icon} Condition: {weather_data['description']}")
     
     # Additional information
+    derived = derived_metrics(weather_data)
     print(f"💧 Humidity: {weather_data['humidity']}%")
-    print(f"🌬️  Wind Speed: {weather_data['wind_speed']} m/s")
+    print(f"💦 Dew point: {derived['dew_point']}°C")
+    print(f"🌬️  Wind Speed: {weather_data['wind_speed']} m/s {derived['wind_compass']} (Beaufort {derived['beaufort']})")
     print(f"☁️  Cloudiness: {weather_data['cloudiness']}%")
     
     if weather_data['pressure']:
@@ -62,10 +65,25 @@ def show_welcome():
     print("="*60)
 
 
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Get real-time weather information for any city.")
+    parser.add_argument("--record", metavar="CASSETTE",
+                        help="append every API response to an NDJSON cassette file")
+    parser.add_argument("--replay", metavar="CASSETTE",
+                        help="answer lookups from a recorded cassette instead of the network")
+    parser.add_argument("--latency-scale", type=float, default=0.0, metavar="SCALE",
+                        help="when replaying, wait SCALE times the recorded response time (default: 0)")
+    return parser.parse_args()
+
+
 def main():
     """Main application loop"""
+    args = parse_args()
+    
     # Initialize weather API
-    weather_api = WeatherAPI()
+    weather_api = create_weather_api(record_path=args.record, replay_path=args.replay,
+                                     latency_scale=args.latency_scale)
     
     # Show welcome message
     show_welcome()
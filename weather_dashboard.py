@@ -0,0 +1,369 @@
+"""
+Weather Dashboard - Multi-city wall display with Tkinter
+Tracks hundreds of cities as tiles on a single canvas. Only the tiles in view are drawn,
+and refreshes only touch tiles whose displayed values changed.
+"""
+
+import argparse
+import random
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime
+from weather_api import WeatherAPI, create_weather_api
+from config import (DASHBOARD_TITLE, DASHBOARD_WIDTH, DASHBOARD_HEIGHT, DASHBOARD_TILE_WIDTH,
+                    DASHBOARD_TILE_HEIGHT, DASHBOARD_TILE_GAP, DASHBOARD_REFRESH_INTERVAL,
+                    DASHBOARD_CITIES, COLORS)
+
+
+class WeatherDashboard:
+    """Multi-city dashboard drawing weather tiles on a single canvas"""
+
+    def __init__(self, cities, weather_api=None, units="metric"):
+        self.root = tk.Tk()
+        self.weather_api = weather_api or WeatherAPI()
+        self.cities = list(dict.fromkeys(cities))
+        self.units = units
+
+        self.tile_data = {}      # city -> (success, data) from the latest lookup
+        self.tile_texts = {}     # city -> texts currently shown on its tile
+        self.drawn_tiles = set()  # indexes of tiles that currently have canvas items
+        self.columns = 1
+        self.loading = False
+        self.refresh_job = None
+
+        self.setup_window()
+        self.create_widgets()
+
+    def setup_window(self):
+        """Configure the main window"""
+        self.root.title(DASHBOARD_TITLE)
+        self.root.geometry(f"{DASHBOARD_WIDTH}x{DASHBOARD_HEIGHT}")
+        self.root.configure(bg=COLORS["background"])
+        self.root.minsize(DASHBOARD_TILE_WIDTH + 60, DASHBOARD_TILE_HEIGHT + 120)
+
+    def create_widgets(self):
+        """Create the header, tile canvas and status bar"""
+        header = tk.Frame(self.root, bg=COLORS["background"])
+        header.pack(fill=tk.X, padx=20, pady=(15, 10))
+
+        tk.Label(header,
+                text=f"🌍 {DASHBOARD_TITLE}",
+                font=('Arial', 20, 'bold'),
+                bg=COLORS["background"],
+                fg=COLORS["text"]).pack(side=tk.LEFT)
+
+        self.refresh_button = ttk.Button(header, text="🔄 Refresh", command=self.refresh)
+        self.refresh_button.pack(side=tk.RIGHT)
+
+        canvas_frame = tk.Frame(self.root, bg=COLORS["background"])
+        canvas_frame.pack(fill=tk.BOTH, expand=True, padx=20)
+
+        self.scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.on_scroll)
+        self.canvas = tk.Canvas(canvas_frame,
+                                bg=COLORS["background"],
+                                highlightthickness=0,
+                                yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.layout())
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self.on_scroll("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.on_scroll("scroll", 1, "units"))
+
+        self.status_var = tk.StringVar()
+        self.status_var.set(f"Tracking {len(self.cities)} cities")
+        tk.Label(self.root,
+                textvariable=self.status_var,
+                font=('Arial', 9),
+                bg=COLORS["background"],
+                fg=COLORS["text"],
+                anchor=tk.W).pack(fill=tk.X, side=tk.BOTTOM, padx=20, pady=5)
+
+    # Layout and virtualization
+
+    def layout(self):
+        """Recompute the tile grid for the current canvas width"""
+        width = max(self.canvas.winfo_width(), DASHBOARD_TILE_WIDTH + 2 * DASHBOARD_TILE_GAP)
+        columns = max(1, (width - DASHBOARD_TILE_GAP) // (DASHBOARD_TILE_WIDTH + DASHBOARD_TILE_GAP))
+        rows = -(-len(self.cities) // columns)
+        height = DASHBOARD_TILE_GAP + rows * (DASHBOARD_TILE_HEIGHT + DASHBOARD_TILE_GAP)
+        self.canvas.configure(scrollregion=(0, 0, width, height),
+                              yscrollincrement=DASHBOARD_TILE_HEIGHT // 2)
+
+        # Tile positions depend on the column count, so redraw if it changed
+        if columns != self.columns:
+            self.columns = columns
+            self.canvas.delete("tile")
+            self.drawn_tiles.clear()
+        self.render_visible()
+
+    def tile_position(self, index):
+        """Top-left canvas coordinates of a tile"""
+        row, column = divmod(index, self.columns)
+        return (DASHBOARD_TILE_GAP + column * (DASHBOARD_TILE_WIDTH + DASHBOARD_TILE_GAP),
+                DASHBOARD_TILE_GAP + row * (DASHBOARD_TILE_HEIGHT + DASHBOARD_TILE_GAP))
+
+    def visible_range(self):
+        """Indexes of the tiles inside the visible part of the canvas"""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        row_height = DASHBOARD_TILE_HEIGHT + DASHBOARD_TILE_GAP
+        first_row = max(0, int(top // row_height))
+        last_row = int(bottom // row_height)
+        return range(first_row * self.columns, min(len(self.cities), (last_row + 1) * self.columns))
+
+    def render_visible(self):
+        """Create canvas items for tiles scrolled into view and delete the rest"""
+        visible = self.visible_range()
+
+        for index in [index for index in self.drawn_tiles if index not in visible]:
+            self.canvas.delete(f"tile{index}")
+            self.drawn_tiles.discard(index)
+
+        for index in visible:
+            if index not in self.drawn_tiles:
+                self.draw_tile(index)
+
+    def draw_tile(self, index):
+        """Create the canvas items for one tile"""
+        x, y = self.tile_position(index)
+        tags = ("tile", f"tile{index}")
+        texts = self.texts_for(self.cities[index])
+
+        self.canvas.create_rectangle(x, y, x + DASHBOARD_TILE_WIDTH, y + DASHBOARD_TILE_HEIGHT,
+                                     fill='white', outline='#DDDDDD', tags=tags)
+        self.canvas.create_text(x + 10, y + 8, anchor="nw", text=texts["name"],
+                                font=('Arial', 11, 'bold'), fill=COLORS["text"],
+                                width=DASHBOARD_TILE_WIDTH - 50, tags=tags + (f"name{index}",))
+        self.canvas.create_text(x + DASHBOARD_TILE_WIDTH - 10, y + 6, anchor="ne", text=texts["icon"],
+                                font=('Arial', 20), tags=tags + (f"icon{index}",))
+        self.canvas.create_text(x + 10, y + 32, anchor="nw", text=texts["temp"],
+                                font=('Arial', 20, 'bold'), fill=texts["color"],
+                                tags=tags + (f"temp{index}",))
+        self.canvas.create_text(x + 10, y + DASHBOARD_TILE_HEIGHT - 24, anchor="nw", text=texts["detail"],
+                                font=('Arial', 9), fill=COLORS["text"],
+                                width=DASHBOARD_TILE_WIDTH - 20, tags=tags + (f"detail{index}",))
+        self.drawn_tiles.add(index)
+
+    def update_tile(self, index, texts):
+        """Update the text items of a drawn tile in place"""
+        self.canvas.itemconfigure(f"icon{index}", text=texts["icon"])
+        self.canvas.itemconfigure(f"temp{index}", text=texts["temp"], fill=texts["color"])
+        self.canvas.itemconfigure(f"detail{index}", text=texts["detail"])
+
+    def texts_for(self, city):
+        """Texts shown on a city's tile, cached until its data changes"""
+        texts = self.tile_texts.get(city)
+        if texts is None:
+            texts = self.tile_texts[city] = self.build_texts(city)
+        return texts
+
+    def build_texts(self, city):
+        """Format the latest lookup result for a city's tile"""
+        result = self.tile_data.get(city)
+        if result is None:
+            return {"name": city, "icon": "⏳", "temp": "--", "color": COLORS["text"], "detail": "Loading..."}
+
+        success, data = result
+        if not success:
+            return {"name": city, "icon": "❌", "temp": "--", "color": COLORS["error"], "detail": data["error"]}
+
+        unit_symbol = "°C" if self.units == "metric" else "°F"
+        speed_unit = "m/s" if self.units == "metric" else "mph"
+        return {
+            "name": city,
+            "icon": WeatherAPI.get_weather_icon(data['description'], data['condition_code']),
+            "temp": f"{data['temperature']}{unit_symbol}",
+            "color": COLORS["primary"],
+            "detail": f"{data['description']} · {data['humidity']}% · {data['wind_speed']} {speed_unit}",
+        }
+
+    # Scrolling
+
+    def on_scroll(self, *args):
+        """Scroll the canvas and draw the tiles that came into view"""
+        self.canvas.yview(*args)
+        self.render_visible()
+
+    def on_mousewheel(self, event):
+        """Scroll with the mouse wheel (Windows and macOS)"""
+        self.on_scroll("scroll", -1 if event.delta > 0 else 1, "units")
+
+    # Data loading
+
+    def refresh(self):
+        """Fetch all cities with one bulk lookup in a background thread"""
+        if self.loading:
+            return
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+            self.refresh_job = None
+        self.loading = True
+        self.refresh_button.configure(state='disabled')
+        self.status_var.set(f"Fetching weather data for {len(self.cities)} cities...")
+
+        thread = threading.Thread(target=self._fetch_all, daemon=True)
+        thread.start()
+
+    def _fetch_all(self):
+        """Run the bulk lookup (runs in separate thread)"""
+        results = self.weather_api.get_bulk_weather_data(self.cities, self.units)
+
+        # Update GUI in main thread
+        self.root.after(0, self._finish_refresh, results)
+
+    def _finish_refresh(self, results):
+        """Apply refreshed results and schedule the next refresh"""
+        self.loading = False
+        self.refresh_button.configure(state='normal')
+
+        changed = self.apply_results(results)
+        failed = sum(1 for success, _ in results.values() if not success)
+        self.status_var.set(f"Updated {changed} of {len(self.cities)} cities ({failed} errors) - "
+                            f"{datetime.now().strftime('%H:%M:%S')}")
+        self.refresh_job = self.root.after(DASHBOARD_REFRESH_INTERVAL * 1000, self.refresh)
+
+    def apply_results(self, results):
+        """
+        Store new lookup results and redraw only the tiles whose texts changed
+
+        Returns:
+            int: Number of cities whose tile changed
+        """
+        index_of = {city: index for index, city in enumerate(self.cities)}
+        changed = 0
+        for city, result in results.items():
+            self.tile_data[city] = result
+            texts = self.build_texts(city)
+            if texts == self.tile_texts.get(city):
+                continue
+
+            self.tile_texts[city] = texts
+            changed += 1
+            index = index_of.get(city)
+            if index in self.drawn_tiles:
+                self.update_tile(index, texts)
+        return changed
+
+    # Frame-time measurement
+
+    def measure(self, refreshes=20):
+        """
+        Scroll through every tile and apply synthetic refreshes, timing each frame
+
+        A frame is the work to bring the canvas up to date plus Tk's redraw.
+        Results are printed and the window closes when done.
+        """
+        self.root.update()
+        row_height = DASHBOARD_TILE_HEIGHT + DASHBOARD_TILE_GAP
+        total_height = DASHBOARD_TILE_GAP + -(-len(self.cities) // self.columns) * row_height
+        steps = max(1, int(total_height // (row_height / 2)))
+
+        scroll_frames = []
+        for step in range(steps + 1):
+            start = time.perf_counter()
+            self.canvas.yview_moveto(step / steps)
+            self.render_visible()
+            self.root.update_idletasks()
+            scroll_frames.append(time.perf_counter() - start)
+
+        refresh_frames = []
+        changes = 0
+        for _ in range(refreshes):
+            results = synthetic_results(self.cities, self.tile_data, change_rate=0.1)
+            start = time.perf_counter()
+            changes += self.apply_results(results)
+            self.root.update_idletasks()
+            refresh_frames.append(time.perf_counter() - start)
+
+        print(f"Frame times for {len(self.cities)} tiles "
+              f"({self.columns} columns, {len(self.drawn_tiles)} drawn at a time):")
+        report_frames("scrolling", scroll_frames)
+        report_frames("refresh", refresh_frames)
+        print(f"    {changes} tile updates over {refreshes} refreshes")
+        self.root.destroy()
+
+    def run(self, measure=False):
+        """Start the dashboard"""
+        self.root.update_idletasks()
+        self.layout()
+        if measure:
+            self.root.after(100, self.measure)
+        else:
+            self.refresh()
+        self.root.mainloop()
+
+
+def synthetic_results(cities, previous=None, change_rate=1.0, seed=None):
+    """
+    Generate lookup results for a frame-time measurement
+
+    Cities with a previous result keep it unless picked by change_rate,
+    in which case their temperature and humidity drift slightly.
+    """
+    rng = random.Random(seed)
+    conditions = [(800, "Clear Sky"), (801, "Few Clouds"), (803, "Broken Clouds"),
+                  (500, "Light Rain"), (600, "Light Snow"), (741, "Fog")]
+    results = {}
+    for city in cities:
+        old = (previous or {}).get(city)
+        if old is not None and old[0] and rng.random() >= change_rate:
+            results[city] = old
+            continue
+
+        data = dict(old[1]) if old is not None and old[0] else None
+        if data is None:
+            code, description = rng.choice(conditions)
+            data = {"city": city, "country": "", "temperature": round(rng.uniform(-10, 35), 1),
+                    "humidity": rng.randint(20, 100), "wind_speed": round(rng.uniform(0, 15), 1),
+                    "description": description, "condition_code": code}
+        else:
+            data["temperature"] = round(data["temperature"] + rng.uniform(-1, 1), 1)
+            data["humidity"] = min(100, max(0, data["humidity"] + rng.randint(-3, 3)))
+        results[city] = (True, data)
+    return results
+
+
+def report_frames(label, frame_times):
+    """Print frame time percentiles in milliseconds"""
+    ordered = sorted(frame_times)
+    p50, p95 = (ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000 for pct in (50, 95))
+    print(f"    {label:<10} frames={len(ordered):<5} p50={p50:6.2f}ms  p95={p95:6.2f}ms  "
+          f"max={ordered[-1] * 1000:6.2f}ms")
+
+
+def load_cities(path):
+    """Read city names from a text file, one per line"""
+    with open(path, encoding="utf-8") as cities_file:
+        return [line.strip() for line in cities_file if line.strip() and not line.startswith("#")]
+
+
+def main():
+    """Main function to run the dashboard"""
+    parser = argparse.ArgumentParser(description="Multi-city weather dashboard.")
+    parser.add_argument("--cities", metavar="FILE", help="text file with one city name per line")
+    parser.add_argument("--replay", metavar="CASSETTE", help="load weather data from a recorded cassette")
+    parser.add_argument("--measure", action="store_true",
+                        help="measure scrolling and refresh frame times with synthetic data, then exit")
+    parser.add_argument("--tiles", type=int, default=400,
+                        help="number of synthetic tiles for --measure without --cities (default: 400)")
+    args = parser.parse_args()
+
+    if args.cities:
+        cities = load_cities(args.cities)
+    elif args.measure:
+        cities = [f"City {i:03d}" for i in range(args.tiles)]
+    else:
+        cities = DASHBOARD_CITIES
+
+    dashboard = WeatherDashboard(cities, create_weather_api(replay_path=args.replay))
+    if args.measure:
+        dashboard.apply_results(synthetic_results(cities, seed=1))
+    dashboard.run(measure=args.measure)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,191 @@ A modern graphical weather application with enhanced features and user-friendly
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import json
+import os
 import threading
+from concurrent import futures
 from datetime import datetime
-from weather_api import WeatherAPI
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_TITLE, COLORS
+from weather_api import WeatherAPI, WeatherCache, WeatherDeltaFeed, derived_metrics
+from config import (WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_TITLE, COLORS, CACHE_TTL, SESSION_FILE,
+                    RECENT_CITIES_LIMIT, PREFETCH_DELAY_MS, PREFETCH_MIN_CHARS, PREFETCH_BUDGET,
+                    DASHBOARD_CITIES)
+
+
+class WeatherSession:
+    """Recent and pinned cities, persisted between GUI launches"""
+    
+    def __init__(self, path=SESSION_FILE):
+        self.path = os.path.expanduser(path)
+        self.recent = []
+        self.pinned = []
+        self.load()
+    
+    def load(self):
+        """Load the session file, starting empty if it is missing or unreadable"""
+        try:
+            with open(self.path, encoding="utf-8") as session_file:
+                data = json.load(session_file)
+            self.recent = [city for city in data.get("recent", []) if isinstance(city, str)]
+            self.pinned = [city for city in data.get("pinned", []) if isinstance(city, str)]
+        except (OSError, ValueError, AttributeError):
+            self.recent, self.pinned = [], []
+    
+    def save(self):
+        """Write the session file, ignoring failures (the session is only a convenience)"""
+        try:
+            with open(self.path, "w", encoding="utf-8") as session_file:
+                json.dump({"recent": self.recent, "pinned": self.pinned}, session_file, indent=2)
+        except OSError:
+            pass
+    
+    def add_recent(self, city):
+        """Move a searched city to the front of the recent list"""
+        self.recent = [city] + [c for c in self.recent if c.lower() != city.lower()]
+        del self.recent[RECENT_CITIES_LIMIT:]
+    
+    def is_pinned(self, city):
+        return any(c.lower() == city.lower() for c in self.pinned)
+    
+    def toggle_pin(self, city):
+        """Pin or unpin a city, returning whether it is now pinned"""
+        if self.is_pinned(city):
+            self.pinned = [c for c in self.pinned if c.lower() != city.lower()]
+            return False
+        self.pinned.append(city)
+        return True
+    
+    def warm_up_cities(self):
+        """Pinned cities first, then recent ones, without duplicates"""
+        cities = {}
+        for city in self.pinned + self.recent:
+            cities.setdefault(city.lower(), city)
+        return list(cities.values())
+    
+    def match(self, text):
+        """
+        Return the only known city that the typed text could refer to
+        
+        Known cities are the session's cities followed by the dashboard list.
+        An exact (case-insensitive) match wins; otherwise the text must be
+        the prefix of exactly one known city.
+        """
+        text = text.strip().lower()
+        if len(text) < PREFETCH_MIN_CHARS:
+            return None
+        
+        candidates = {}
+        for city in self.warm_up_cities() + DASHBOARD_CITIES:
+            if city.lower().startswith(text):
+                candidates.setdefault(city.lower(), city)
+        if text in candidates:
+            return candidates[text]
+        return next(iter(candidates.values())) if len(candidates) == 1 else None
+
+
+class Prefetcher:
+    """
+    Fetches cities in the background before they are searched for
+    
+    Results land in the WeatherAPI's WeatherCache, so a later search for
+    the same city is answered without waiting for the network. Speculative
+    requests are capped by a budget; session warm-up is not.
+    """
+    
+    def __init__(self, weather_api, budget=PREFETCH_BUDGET, max_age=CACHE_TTL):
+        self.weather_api = weather_api
+        self.budget = budget
+        self.max_age = max_age
+        self.pending = {}     # cache key -> future of an in-flight prefetch
+        self.prefetched = set()
+        self.stats = {"speculative": 0, "warm_up": 0, "searches": 0, "hits": 0}
+        self._lock = threading.Lock()
+        self._executor = futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="weather-prefetch")
+    
+    def prefetch(self, city, units, speculative=True):
+        """
+        Start fetching a city in the background
+        
+        Returns:
+            bool: Whether a request was started
+        """
+        key = WeatherCache.key(city, units)
+        with self._lock:
+            if key in self.pending or self.weather_api.cache.fresh(key, self.max_age) is not None:
+                return False
+            if speculative and self.stats["speculative"] >= self.budget:
+                return False
+            self.stats["speculative" if speculative else "warm_up"] += 1
+            self.prefetched.add(key)
+            future = self._executor.submit(self.weather_api.get_weather_data, city, units)
+            self.pending[key] = future
+        future.add_done_callback(lambda f: self._finish(key))
+        return True
+    
+    def _finish(self, key):
+        with self._lock:
+            self.pending.pop(key, None)
+    
+    def warm_up(self, cities, units):
+        """Prefetch a list of cities, e.g. the session's pinned and recent ones"""
+        return sum(self.prefetch(city, units, speculative=False) for city in cities)
+    
+    def shutdown(self):
+        """Drop queued prefetches so closing the app doesn't wait on them"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def lookup(self, city, units):
+        """
+        Get weather data for a search, using a prefetched result when there is one
+        
+        A search counts as a hit when a prefetched result (finished or still
+        in flight) answers it. Each prefetch answers at most one search;
+        other searches, e.g. repeats and unit changes, always go to the network.
+        """
+        key = WeatherCache.key(city, units)
+        with self._lock:
+            self.stats["searches"] += 1
+            future = self.pending.get(key)
+            prefetched = key in self.prefetched
+            self.prefetched.discard(key)
+        
+        if not prefetched:
+            return self.weather_api.get_weather_data(city, units)
+        
+        if future is not None:
+            future.result()
+        
+        if self.weather_api.cache.fresh(key, self.max_age) is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+        return self.weather_api.get_weather_data(city, units, max_age=self.max_age)
+    
+    def summary(self):
+        """One-line summary of prefetch requests and how often they paid off"""
+        with self._lock:
+            stats = dict(self.stats)
+        hit_rate = stats["hits"] / stats["searches"] if stats["searches"] else 0.0
+        return (f"Prefetch: {stats['hits']}/{stats['searches']} searches served ({hit_rate:.0%}), "
+                f"{stats['speculative']}/{self.budget} speculative, {stats['warm_up']} warm-up")
 
 
 class WeatherGUI:
     """Main GUI class for the Weather Application"""
     
+    # Value labels outside the details grid (see weather_texts)
+    MAIN_TEXT_KEYS = ("description", "temperature", "feels_like")
+    
     def __init__(self):
         self.root = tk.Tk()
-        self.weather_api = WeatherAPI()
+        self.weather_api = WeatherAPI(cache=WeatherCache())
+        self.session = WeatherSession()
+        self.prefetcher = Prefetcher(self.weather_api)
         self.current_units = "metric"  # metric or imperial
         self.current_weather_data = None
+        self.displayed_units = None
+        self.value_labels = {}  # weather_texts key -> label showing it
+        self.delta_feed = WeatherDeltaFeed()
+        self.prefetch_job = None
         
         self.setup_window()
         self.create_widgets()
@@ -103,6 +274,7 @@ class WeatherGUI:
                                   width=30)
         self.city_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
         self.city_entry.bind('<Return>', lambda e: self.search_weather())
+        self.city_entry.bind('<KeyRelease>', self.on_city_typed)
         
         self.search_button = ttk.Button(input_frame,
                                        text="🔍 Search",
@@ -133,6 +305,13 @@ class WeatherGUI:
                                            width=5,
                                            command=lambda: self.toggle_units("imperial"))
         self.fahrenheit_button.pack(side=tk.LEFT)
+        
+        self.pin_button = ttk.Button(unit_frame,
+                                    text="☆ Pin",
+                                    style='Unit.TButton',
+                                    state='disabled',
+                                    command=self.toggle_pin)
+        self.pin_button.pack(side=tk.RIGHT)
     
     def create_weather_frame(self, parent):
         """Create the weather information display section"""
@@ -217,9 +396,24 @@ class WeatherGUI:
         thread.daemon = True
         thread.start()
     
+    def on_city_typed(self, event):
+        """Restart the prefetch timer whenever the typed city changes"""
+        if event.keysym == "Return":
+            return
+        if self.prefetch_job is not None:
+            self.root.after_cancel(self.prefetch_job)
+        self.prefetch_job = self.root.after(PREFETCH_DELAY_MS, self.prefetch_typed_city)
+    
+    def prefetch_typed_city(self):
+        """Fetch the typed city in the background once it matches a single known city"""
+        self.prefetch_job = None
+        city = self.session.match(self.city_entry.get())
+        if city:
+            self.prefetcher.prefetch(city, self.current_units)
+    
     def _fetch_weather_data(self, city):
         """Fetch weather data from API (runs in separate thread)"""
-        success, data = self.weather_api.get_weather_data(city, self.current_units)
+        success, data = self.prefetcher.lookup(city, self.current_units)
         
         # Update GUI in main thread
         self.root.after(0, self._update_weather_display, success, data)
@@ -230,19 +424,73 @@ class WeatherGUI:
         self.search_button.configure(state='normal', text="🔍 Search")
         
         if success:
-            self.current_weather_data = data
-            self.display_weather_data(data)
-            self.status_var.set(f"Weather data updated for {data['city']} - {datetime.now().strftime('%H:%M:%S')}")
+            if self.is_displaying(data['city']):
+                # Same city on screen: only touch the labels whose values changed
+                event = self.delta_feed.update(data['city'], data, self.current_units)
+                changes = event["changes"] if event else {}
+                self.current_weather_data = {**self.current_weather_data, **changes}
+                self.apply_weather_texts(self.weather_texts(self.current_weather_data))
+                update_text = f"{len(changes)} values changed" if changes else "no changes"
+            else:
+                # Full redraw: restart the feed's baseline from what is drawn
+                self.delta_feed.forget(data['city'], self.current_units)
+                self.delta_feed.update(data['city'], data, self.current_units)
+                self.current_weather_data = data
+                self.display_weather_data(data)
+                update_text = "updated"
+            self.session.add_recent(data['city'])
+            self.session.save()
+            self.update_pin_button()
+            self.status_var.set(f"Weather data for {data['city']} {update_text} - {datetime.now().strftime('%H:%M:%S')}"
+                                f"  |  {self.prefetcher.summary()}")
         else:
             self.show_error_message(data['error'])
             self.status_var.set("Error fetching weather data")
     
+    def is_displaying(self, city):
+        """Check whether weather for a city is on screen in the current units"""
+        return (bool(self.value_labels) and self.current_weather_data is not None
+                and self.current_weather_data['city'] == city
+                and self.displayed_units == self.current_units)
+    
+    def weather_texts(self, data):
+        """Texts of the value labels for a weather result, keyed by label"""
+        unit_symbol = "°C" if self.current_units == "metric" else "°F"
+        speed_unit = "m/s" if self.current_units == "metric" else "mph"
+        derived = derived_metrics(data, self.current_units)
+        icon = WeatherAPI.get_weather_icon(data['description'], data['condition_code'])
+        
+        return {
+            "description": f"{icon} {data['description']}",
+            "temperature": f"{data['temperature']}{unit_symbol}",
+            "feels_like": f"Feels like {data['feels_like']}{unit_symbol}",
+            "💧 Humidity": f"{data['humidity']}%",
+            "🌬️ Wind Speed": f"{data['wind_speed']} {speed_unit}",
+            "☁️ Cloudiness": f"{data['cloudiness']}%",
+            "📊 Pressure": f"{data['pressure']} hPa",
+            "👁️ Visibility": f"{data['visibility']} km",
+            "🧭 Wind Direction": f"{data['wind_direction']}° {derived['wind_compass']}",
+            "💦 Dew Point": f"{derived['dew_point']}{unit_symbol}",
+            "🌅 Daylight": f"{derived['daylight_hours']} h"
+        }
+    
+    def apply_weather_texts(self, texts):
+        """Update the displayed value labels whose text changed"""
+        for key, text in texts.items():
+            label = self.value_labels.get(key)
+            if label is not None and label.cget('text') != text:
+                label.configure(text=text)
+    
     def display_weather_data(self, data):
         """Display weather information in the GUI"""
         # Clear previous content
         for widget in self.weather_frame.winfo_children():
             widget.destroy()
         
+        texts = self.weather_texts(data)
+        self.value_labels = {}
+        self.displayed_units = self.current_units
+        
         # Main weather info frame
         main_info = tk.Frame(self.weather_frame, bg='white')
         main_info.pack(fill=tk.X, padx=20, pady=20)
@@ -259,36 +507,36 @@ class WeatherGUI:
                 fg=COLORS["text"]).pack()
         
         # Weather icon and description
-        icon = WeatherAPI.get_weather_icon(data['description'])
-        tk.Label(main_info,
-                text=f"{icon} {data['description']}",
-                font=('Arial', 16),
-                bg='white',
-                fg=COLORS["text"]).pack(pady=(5, 15))
+        self.value_labels["description"] = tk.Label(main_info,
+                                                    text=texts["description"],
+                                                    font=('Arial', 16),
+                                                    bg='white',
+                                                    fg=COLORS["text"])
+        self.value_labels["description"].pack(pady=(5, 15))
         
         # Temperature section
         temp_frame = tk.Frame(self.weather_frame, bg='white')
         temp_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
         
-        unit_symbol = "°C" if self.current_units == "metric" else "°F"
-        
         # Main temperature
-        tk.Label(temp_frame,
-                text=f"{data['temperature']}{unit_symbol}",
-                font=('Arial', 36, 'bold'),
-                bg='white',
-                fg=COLORS["primary"]).pack()
-        
-        tk.Label(temp_frame,
-                text=f"Feels like {data['feels_like']}{unit_symbol}",
-                font=('Arial', 12),
-                bg='white',
-                fg=COLORS["text"]).pack()
+        self.value_labels["temperature"] = tk.Label(temp_frame,
+                                                    text=texts["temperature"],
+                                                    font=('Arial', 36, 'bold'),
+                                                    bg='white',
+                                                    fg=COLORS["primary"])
+        self.value_labels["temperature"].pack()
+        
+        self.value_labels["feels_like"] = tk.Label(temp_frame,
+                                                   text=texts["feels_like"],
+                                                   font=('Arial', 12),
+                                                   bg='white',
+                                                   fg=COLORS["text"])
+        self.value_labels["feels_like"].pack()
         
         # Details section
-        self.create_details_section(data, unit_symbol)
+        self.create_details_section(texts)
     
-    def create_details_section(self, data, unit_symbol):
+    def create_details_section(self, texts):
         """Create the detailed weather information section"""
         details_frame = tk.Frame(self.weather_frame, bg='white')
         details_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
@@ -303,14 +551,7 @@ class WeatherGUI:
         grid_frame = tk.Frame(details_frame, bg='white')
         grid_frame.pack(fill=tk.X)
         
-        details = [
-            ("💧 Humidity", f"{data['humidity']}%"),
-            ("🌬️ Wind Speed", f"{data['wind_speed']} m/s"),
-            ("☁️ Cloudiness", f"{data['cloudiness']}%"),
-            ("📊 Pressure", f"{data['pressure']} hPa"),
-            ("👁️ Visibility", f"{data['visibility']} km"),
-            ("🧭 Wind Direction", f"{data['wind_direction']}°")
-        ]
+        details = [(label, value) for label, value in texts.items() if label not in self.MAIN_TEXT_KEYS]
         
         for i, (label, value) in enumerate(details):
             row = i // 2
@@ -325,16 +566,18 @@ class WeatherGUI:
                     bg='white',
                     fg=COLORS["text"]).pack(anchor='w')
             
-            tk.Label(detail_frame,
-                    text=value,
-                    font=('Arial', 10),
-                    bg='white',
-                    fg=COLORS["text"]).pack(anchor='w')
+            self.value_labels[label] = tk.Label(detail_frame,
+                                                text=value,
+                                                font=('Arial', 10),
+                                                bg='white',
+                                                fg=COLORS["text"])
+            self.value_labels[label].pack(anchor='w')
     
     def show_error_message(self, error_message):
         """Display error message in the weather frame"""
         for widget in self.weather_frame.winfo_children():
             widget.destroy()
+        self.value_labels = {}
         
         error_frame = tk.Frame(self.weather_frame, bg='white')
         error_frame.pack(expand=True, fill=tk.BOTH)
@@ -398,11 +641,34 @@ class WeatherGUI:
                 city = self.current_weather_data['city']
                 self.search_weather()
     
+    def toggle_pin(self):
+        """Pin or unpin the displayed city so it is prefetched at startup"""
+        if self.current_weather_data:
+            self.session.toggle_pin(self.current_weather_data['city'])
+            self.session.save()
+            self.update_pin_button()
+    
+    def update_pin_button(self):
+        """Show whether the displayed city is pinned"""
+        pinned = self.session.is_pinned(self.current_weather_data['city'])
+        self.pin_button.configure(state='normal', text="★ Pinned" if pinned else "☆ Pin")
+    
+    def on_close(self):
+        """Stop background prefetches and close the window"""
+        self.prefetcher.shutdown()
+        self.root.destroy()
+    
     def run(self):
         """Start the GUI application"""
         # Set initial button states
         self.celsius_button.configure(state='disabled')
         
+        # Cancel queued prefetches when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Warm up the cache with the cities from the last session
+        self.prefetcher.warm_up(self.session.warm_up_cities(), self.current_units)
+        
         # Focus on city entry
         self.city_entry.focus()
         